@@ -5,22 +5,42 @@ https://github.com/telegram-toys/telethon_objects_serialization
 """
 import base64
 import datetime
+import functools
+import inspect
+import io
 import json
 import logging
+import math
+import pickle
 import sys
 import types
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
 from typing import Any
 from typing import Final
+from typing import TextIO
+from typing import TypeVar
 
 import telethon
 from telethon.tl import TLObject
 from telethon.tl import alltlobjects
 from telethon.tl import patched
 
+orjson: types.ModuleType | None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+TLObjectT = TypeVar('TLObjectT', bound=TLObject)
+
 _PATCHED_CLASS_NAMES: Final[set[str]] = set()
 _CLASS_CACHE: Final[dict[str, type[TLObject]]] = {}
+_CONSTRUCTOR_CACHE: Final[dict[str, Callable[[dict[str, Any]], TLObject]]] = {}
+_LAZY_CLASS_NAMES: Final[set[str]] = set()
 _PATCH_CALLED: bool = False
 
 
@@ -30,35 +50,117 @@ def _check_patch_was_applied() -> None:
 
 
 def full_class_name(obj: Any) -> str:
-    return f'{obj.__module__}.{obj.__qualname__}'
+    klass = obj if isinstance(obj, type) else type(obj)
+    # class __dict__ is checked instead of getattr() so subclasses of patched classes don't inherit the name
+    full_name = klass.__dict__.get('_tl_full_name')
+    if full_name is not None:
+        return full_name
+    return f'{klass.__module__}.{klass.__qualname__}'
+
+
+def _to_dict_owner(klass: type[TLObject]) -> type[TLObject]:
+    for base in klass.__mro__:
+        if 'to_dict' in base.__dict__:
+            return base
+    return TLObject
+
+
+def _tl_fields(klass: type[TLObject]) -> tuple[str, ...] | None:
+    # generated to_dict() emits exactly the __init__() arguments of the class defining it
+    owner = _to_dict_owner(klass)
+    if '_tl_full_name' in owner.__dict__:
+        return owner.__dict__['_tl_fields']
+    if owner is TLObject:
+        return None
+    init = owner.__dict__.get('__init__')
+    if init is None:
+        return ()
+    code = init.__code__
+    return code.co_varnames[1 : code.co_argcount + code.co_kwonlyargcount]
+
+
+def _tl_list_fields(klass: type[TLObject], fields: tuple[str, ...] | None) -> frozenset[str]:
+    # generated to_dict() writes None vector fields as [], ask it which fields these are
+    if not fields:
+        return frozenset()
+    owner = _to_dict_owner(klass)
+    if '_tl_full_name' in owner.__dict__:
+        return owner.__dict__['_tl_list_fields']
+    probe = object.__new__(owner)
+    for name in fields:
+        setattr(probe, name, None)
+    sample = owner.to_dict(probe)
+    return frozenset(name for name in fields if sample[name] == [])
+
+
+def _tl_float_fields(klass: type[TLObject], fields: tuple[str, ...] | None) -> frozenset[str]:
+    # generated __init__() annotates double fields as float
+    if not fields:
+        return frozenset()
+    annotations = getattr(_to_dict_owner(klass).__dict__.get('__init__'), '__annotations__', {})
+    return frozenset(name for name in fields if annotations.get(name) in (float, float | None))
 
 
 def _patch_to_dict_method(klass: Any) -> None:
-    full_name = full_class_name(klass)
+    # cheap check for already patched classes, get_telethon_class() re-scans all TLObject subclasses
+    if '_tl_full_name' in klass.__dict__:
+        return
+
+    full_name = sys.intern(full_class_name(klass))
 
     if not issubclass(klass, TLObject):
         logger.warning('not a subclass of TLObject: %s -- %s', type(klass), full_name)
         return
 
+    # subclass of a patched class e.g. seen later by default_json_helper(), its to_dict() is already wrapped.
+    # Dumps get the name of the class owning to_dict(), like to_dict() itself, so they load in any process.
+    owner = _to_dict_owner(klass)
+    if owner is not klass and '_tl_full_name' in owner.__dict__:
+        klass._tl_fields = owner.__dict__['_tl_fields']
+        klass._tl_list_fields = owner.__dict__['_tl_list_fields']
+        klass._tl_float_fields = owner.__dict__['_tl_float_fields']
+        klass._tl_full_name = owner.__dict__['_tl_full_name']
+        logger.debug('%s is dumped as %s', full_name, klass._tl_full_name)
+        return
+
     if full_name in _PATCHED_CLASS_NAMES:
         return
+
+    # must be done before klass.to_dict is replaced by the wrapper below, and before any registration,
+    # a failed probe of a hand-written to_dict() falls back to calling it
+    fields = _tl_fields(klass)
+    try:
+        list_fields = _tl_list_fields(klass, fields)
+    except Exception:
+        logger.debug('to_dict() probe failed for %s, dumps will call it', full_name, exc_info=True)
+        fields, list_fields = None, frozenset()
+    klass._tl_fields = fields
+    klass._tl_list_fields = list_fields
+    klass._tl_float_fields = _tl_float_fields(klass, fields)
+
     _PATCHED_CLASS_NAMES.add(full_name)
+    _CLASS_CACHE[full_name] = klass
+    klass._tl_full_name = full_name
 
     basename = klass.__qualname__
 
     original_func = klass.to_dict
 
-    def new_to_dict(self: type[TLObject]) -> dict[str, Any]:
-        result = original_func(self)
-        if result['_'] != basename:
-            raise ValueError(f'class name mismatch: dump={result['_']!r}, class={basename!r}')
-        result['_'] = full_name
+    # values are bound as defaults to avoid closure cell lookups, the check is dropped by "python -O"
+    def new_to_dict(
+        self: type[TLObject],
+        _original_func: Any = original_func,
+        _basename: str = basename,
+        _full_name: str = full_name,
+    ) -> dict[str, Any]:
+        result = _original_func(self)
+        if __debug__ and result['_'] != _basename:
+            raise ValueError(f'class name mismatch: dump={result['_']!r}, class={_basename!r}')
+        result['_'] = _full_name
         return result
 
     klass.to_dict = new_to_dict
 
-    _CLASS_CACHE[full_name] = klass
-
     logger.debug('patched %s', full_name)
 
 
@@ -68,12 +170,13 @@ def patch_telethon_classes() -> None:
         raise RuntimeError('patch_telethon_classes already called')
     _PATCH_CALLED = True
 
-    for klass in alltlobjects.tlobjects.values():
-        _patch_to_dict_method(klass)
-    alltlobjects_patched_count = len(_PATCHED_CLASS_NAMES)
+    # dict keeps the order: alltlobjects first, then other direct subclasses
+    classes = dict.fromkeys(alltlobjects.tlobjects.values())
+    alltlobjects_patched_count = len(classes)
+    classes.update(dict.fromkeys(TLObject.__subclasses__()))
 
-    for subclass in TLObject.__subclasses__():
-        _patch_to_dict_method(subclass)
+    for klass in classes:
+        _patch_to_dict_method(klass)
 
     total_patched = len(_PATCHED_CLASS_NAMES)
     non_alltlobjects_patched_count = total_patched - alltlobjects_patched_count
@@ -104,66 +207,381 @@ def report_same_basename_classes() -> None:
 
 def get_telethon_class(class_name: str) -> type[TLObject]:
     _check_patch_was_applied()
-    if class_name in _CLASS_CACHE:
+    try:
         return _CLASS_CACHE[class_name]
+    except KeyError:
+        pass
 
-    raise ValueError(f'unknown class: {class_name}')
+    # the class may have been imported after patch_telethon_classes() call
+    for subclass in TLObject.__subclasses__():
+        _patch_to_dict_method(subclass)
+    try:
+        return _CLASS_CACHE[class_name]
+    except KeyError:
+        raise ValueError(f'unknown class: {class_name}') from None
 
 
-def restore_instance(raw: Any) -> Any:
-    if isinstance(raw, (int, float, str, bytes, datetime.datetime, types.NoneType)):
-        return raw
-    if isinstance(raw, list):
-        return [restore_instance(x) for x in raw]
-    if isinstance(raw, dict):
-        restored_dict = {k: restore_instance(v) for k, v in raw.items()}
-        class_name = restored_dict.pop('_', None)
-        if class_name is None:
-            return restored_dict
-        if not isinstance(class_name, str):
-            raise ValueError(f'value for "_" key should be str but got {type(class_name)} -- {class_name!r}')
-        obj_class = get_telethon_class(class_name)
-        return obj_class(**restored_dict)
-    raise TypeError(f'unsupported type: {type(raw)}')
+def set_lazy_classes(class_names: Iterable[str]) -> None:
+    # objects of these classes are restored as LazyTLWrapper, pass empty iterable to disable
+    _check_patch_was_applied()
+    names = set(class_names)
+    for class_name in names:
+        get_telethon_class(class_name)
+    _LAZY_CLASS_NAMES.clear()
+    _LAZY_CLASS_NAMES.update(names)
+
+
+def _make_constructor(klass: type[TLObject]) -> Callable[[dict[str, Any]], TLObject]:
+    # constructors take the decoded dict as is, including the "_" key, and must not change it:
+    # LazyTLWrapper keeps its dict for another try if the construction fails
+    def construct(kwargs: dict[str, Any]) -> TLObject:
+        return klass(**{k: v for k, v in kwargs.items() if k != '_'})
+
+    init = klass.__init__
+    if init is object.__init__:
+        arg_names: tuple[str, ...] = ()
+    elif inspect.isfunction(init) and klass.__new__ is object.__new__:
+        code = init.__code__
+        arg_names = code.co_varnames[1 : code.co_argcount]
+        # only __init__() doing nothing but "self.<arg> = <arg>" can be bypassed
+        if (
+            code.co_kwonlyargcount
+            or code.co_flags & (inspect.CO_VARARGS | inspect.CO_VARKEYWORDS)
+            or set(code.co_names) != set(arg_names)
+            or any(value is not None for value in init.__defaults__ or ())
+        ):
+            return construct
+    else:
+        return construct
+
+    lines = [
+        'def fast_construct(kwargs):',
+        f'    if len(kwargs) != {len(arg_names) + 1}:',
+        '        return construct(kwargs)',
+        '    obj = new(klass)',
+    ]
+    if arg_names:
+        lines.append('    try:')
+        lines.extend(f'        obj.{name} = kwargs[{name!r}]' for name in arg_names)
+        # unexpected argument names, let __init__() report them
+        lines.extend(['    except KeyError:', '        return construct(kwargs)'])
+    lines.append('    return obj')
+    namespace: dict[str, Any] = {'klass': klass, 'new': object.__new__, 'construct': construct}
+    exec('\n'.join(lines), namespace)
+    return namespace['fast_construct']
+
+
+class _NonFiniteFloat(float):
+    # orjson writes NaN and infinities as null, but calls default() for float subclasses.
+    # default_json_helper() rejects this one, so such dumps are left to the json module, which keeps the value
+    __slots__ = ()
+
+    def __reduce__(self) -> tuple[type[float], tuple[float]]:
+        return float, (float(self),)
+
+
+def _json_float(value: Any) -> Any:
+    if type(value) is float and not math.isfinite(value):
+        return _NonFiniteFloat(value)
+    return value
+
+
+def _make_to_json_dict(klass: type[TLObject]) -> Callable[[TLObject], dict[str, Any]]:
+    fields = klass.__dict__['_tl_fields']
+    if fields is None:
+        return klass.to_dict
+    list_fields = klass.__dict__['_tl_list_fields']
+    float_fields = klass.__dict__['_tl_float_fields']
+    values = {
+        name: (
+            f'[] if obj.{name} is None else obj.{name}'
+            if name in list_fields
+            else f'json_float(obj.{name})'
+            if name in float_fields
+            else f'obj.{name}'
+        )
+        for name in fields
+    }
+    # a dict display is faster than filling the dict with getattr() in a loop
+    items = ', '.join(['"_": full_name'] + [f'{name!r}: {value}' for name, value in values.items()])
+    namespace: dict[str, Any] = {'full_name': klass.__dict__['_tl_full_name'], 'json_float': _json_float}
+    exec(f'def to_json_dict(obj):\n    return {{{items}}}', namespace)
+    return namespace['to_json_dict']
 
 
 def default_json_helper(obj: Any) -> dict[str, Any]:
+    # patched classes are recognized by a single class __dict__ lookup, without walking the MRO
+    klass_dict = type(obj).__dict__
+    to_json_dict = klass_dict.get('_tl_to_json_dict')
+    if to_json_dict is not None:
+        return to_json_dict(obj)
+    if '_tl_full_name' in klass_dict:
+        # generated on first use, doing it for all classes in patch_telethon_classes() slows down startup
+        to_json_dict = _make_to_json_dict(type(obj))
+        type(obj)._tl_to_json_dict = to_json_dict
+        return to_json_dict(obj)
+    if type(obj) is LazyTLWrapper:
+        if obj._tl_obj is not None:
+            return default_json_helper(obj._tl_obj)
+        float_fields = obj.__class__.__dict__.get('_tl_float_fields')
+        if float_fields:
+            return {k: _json_float(v) if k in float_fields else v for k, v in obj._tl_kwargs.items()}
+        return obj._tl_kwargs
+    if isinstance(obj, TLObject):
+        # the class may have been imported after patch_telethon_classes() call
+        _patch_to_dict_method(type(obj))
+        if '_tl_full_name' not in type(obj).__dict__:
+            raise TypeError(f'default_json_helper: class was not patched: {type(obj)!r}')
+        return default_json_helper(obj)
     if isinstance(obj, datetime.datetime):
         # if obj.tzinfo is None:
         #     raise ValueError(f'passed datetime without timezone: {obj}')
         return {'_isoformat': obj.isoformat()}
     if isinstance(obj, bytes):
-        return {'_base64': True, 'encoded': base64.encodebytes(obj).decode()}
+        return {'_base64': True, 'encoded': base64.b64encode(obj).decode('ascii')}
     raise TypeError(f'default_json_helper: Object of type {type(obj)!r} is not serializable')
 
 
-def object_hook_json_helper(obj: dict[Any, Any]) -> Any:
+class TLEncoder(json.JSONEncoder):
+    """
+    Encodes TL objects attribute by attribute, so nested TL objects are walked
+    by the encoder itself instead of through the patched to_dict() methods
+    """
+
+    def default(self, o: Any) -> Any:
+        return default_json_helper(o)
+
+
+def _get_constructor(class_name: str) -> Callable[[dict[str, Any]], TLObject]:
+    constructor = _CONSTRUCTOR_CACHE.get(class_name)
+    if constructor is None:
+        constructor = _make_constructor(get_telethon_class(class_name))
+        _CONSTRUCTOR_CACHE[class_name] = constructor
+    return constructor
+
+
+class LazyTLWrapper:
+    """
+    Keeps restored fields of a TL object and creates the object on first attribute access.
+    isinstance() checks see the wrapped class, so Telethon code can use the wrapper as is
+    """
+
+    __slots__ = ('_tl_class_name', '_tl_kwargs', '_tl_obj')
+
+    def __init__(self, class_name: str, kwargs: dict[str, Any]) -> None:
+        # the wrapper outlives the decoded dump, keep one copy of each class name
+        object.__setattr__(self, '_tl_class_name', sys.intern(class_name))
+        object.__setattr__(self, '_tl_kwargs', kwargs)
+        object.__setattr__(self, '_tl_obj', None)
+
+    @property  # type: ignore[misc]  # read-only on purpose, isinstance() must see the wrapped class
+    def __class__(self) -> type[TLObject]:
+        return get_telethon_class(self._tl_class_name)
+
+    def tl_materialize(self) -> TLObject:
+        obj = self._tl_obj
+        if obj is None:
+            obj = _get_constructor(self._tl_class_name)(self._tl_kwargs)
+            object.__setattr__(self, '_tl_obj', obj)
+            object.__setattr__(self, '_tl_kwargs', None)
+        return obj
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.tl_materialize(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.tl_materialize(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self.tl_materialize(), name)
+
+    def __eq__(self, other: object) -> bool:
+        return self.tl_materialize() == other
+
+    def __ne__(self, other: object) -> bool:
+        return self.tl_materialize() != other
+
+    def __str__(self) -> str:
+        return str(self.tl_materialize())
+
+    def __repr__(self) -> str:
+        return repr(self.tl_materialize())
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.tl_materialize())
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        return self.tl_materialize().__reduce_ex__(protocol)
+
+
+# datetime is immutable, so instances for repeated timestamps can be shared
+@functools.lru_cache(maxsize=4096)
+def _parse_isoformat(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value)
+
+
+def object_hook_json_helper(obj: dict[str, Any]) -> Any:
+    # json.loads() calls the hook bottom-up, so nested TL objects are already restored at this point.
+    # TL objects are the most common case and are checked first.
+    class_name = obj.get('_')
+    if class_name is not None:
+        if type(class_name) is not str:
+            raise ValueError(f'value for "_" key should be str but got {type(class_name)} -- {class_name!r}')
+        if _LAZY_CLASS_NAMES and class_name in _LAZY_CLASS_NAMES:
+            return LazyTLWrapper(class_name, obj)
+        constructor = _CONSTRUCTOR_CACHE.get(class_name) or _get_constructor(class_name)
+        return constructor(obj)
+
     _isoformat = obj.get('_isoformat')
     if _isoformat is not None:
-        return datetime.datetime.fromisoformat(_isoformat)
+        return _parse_isoformat(_isoformat)
 
     _base64 = obj.get('_base64')
     if _base64 is not None:
-        return base64.decodebytes(obj['encoded'].encode())
+        # b64decode() skips the newlines written by older base64.encodebytes() dumps
+        return base64.b64decode(obj['encoded'])
 
     return obj
 
 
-def tl_obj_to_string(obj: TLObject, ensure_ascii: bool = True, indent: int | None = None) -> str:
+_JSON_TREE_LEAF_TYPES: Final = frozenset({str, int, bool, float, types.NoneType, bytes, datetime.datetime})
+
+
+def _to_json_tree(value: Any) -> Any:
+    # for the pure-Python encoder, a default() call per TL object costs more than building the tree up front
+    value_type = type(value)
+    if value_type is list or value_type is tuple:
+        # TL vectors hold one type, the C-level check stops at the first element of a vector of objects
+        if _JSON_TREE_LEAF_TYPES.issuperset(map(type, value)):
+            return value
+        return [x if type(x) in _JSON_TREE_LEAF_TYPES else _to_json_tree(x) for x in value]
+    if value_type is dict:
+        obj_dict = value
+    elif isinstance(value, TLObject):
+        # also true for LazyTLWrapper
+        obj_dict = default_json_helper(value)
+    elif isinstance(value, (list, tuple)):
+        return [_to_json_tree(x) for x in value]
+    elif isinstance(value, dict):
+        obj_dict = value
+    else:
+        # str/int/float subclasses, datetime and bytes are left to the encoder
+        return value
+    return {k: v if type(v) in _JSON_TREE_LEAF_TYPES else _to_json_tree(v) for k, v in obj_dict.items()}
+
+
+def tl_obj_to_string(obj: TLObject, ensure_ascii: bool = False, indent: int | None = None) -> str:
+    _check_patch_was_applied()
+    # orjson always emits UTF-8 and has no arbitrary indent support
+    if orjson is not None and not ensure_ascii and indent is None:
+        try:
+            return orjson.dumps(obj, default=default_json_helper, option=orjson.OPT_PASSTHROUGH_DATETIME).decode()
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits, stdlib json handles them
+            pass
+    if indent is not None:
+        # json uses its C encoder only without indent
+        obj = _to_json_tree(obj)
+    return json.dumps(obj, cls=TLEncoder, ensure_ascii=ensure_ascii, indent=indent)
+
+
+def tl_obj_to_writer(obj: TLObject, writer: TextIO, ensure_ascii: bool = False, indent: int | None = None) -> None:
+    # writes the dump chunk by chunk, the whole string is never built in memory
     _check_patch_was_applied()
-    obj_dict = obj.to_dict()
-    return json.dumps(obj_dict, ensure_ascii=ensure_ascii, indent=indent, default=default_json_helper)
+    encoder = TLEncoder(ensure_ascii=ensure_ascii, indent=indent)
+    for chunk in encoder.iterencode(obj):
+        writer.write(chunk)
+
+
+# json.loads() with object_hook creates a new decoder on every call
+_JSON_DECODER: Final = json.JSONDecoder(object_hook=object_hook_json_helper)
 
 
 def tl_obj_from_string(dump: str) -> TLObject:
     _check_patch_was_applied()
-    restored_dict = json.loads(dump, object_hook=object_hook_json_helper)
-    restored_obj = restore_instance(restored_dict)
+    restored_obj = _JSON_DECODER.decode(dump)
+    if not isinstance(restored_obj, TLObject):
+        raise TypeError(f'restored object is not descendant of TLObject but {type(restored_obj)!r}')
+    return restored_obj
+
+
+def tl_obj_stream_from_strings(dumps: Iterable[str], expected_cls: type[TLObjectT]) -> Iterator[TLObjectT]:
+    _check_patch_was_applied()
+    decode = _JSON_DECODER.decode
+    for dump in dumps:
+        restored_obj = decode(dump)
+        if not isinstance(restored_obj, expected_cls):
+            raise TypeError(f'restored object is not instance of {expected_cls!r} but {type(restored_obj)!r}')
+        yield restored_obj
+
+
+def _restore_dict_tree(value: Any) -> Any:
+    # dumps of classes without known fields are nested to_dict() dicts, restore them bottom-up like json.loads()
+    value_type = type(value)
+    if value_type is dict:
+        return object_hook_json_helper({k: _restore_dict_tree(v) for k, v in value.items()})
+    if value_type is list:
+        return [_restore_dict_tree(x) for x in value]
+    return value
+
+
+class _TLPickler(pickle.Pickler):
+    # TL objects are restored by the same code as JSON dumps, copy/deepcopy of TL objects is left untouched
+    def reducer_override(self, obj: Any) -> Any:
+        if isinstance(obj, TLObject):
+            obj_dict = default_json_helper(obj)
+            if type(obj).__dict__.get('_tl_fields', ()) is None:
+                return _restore_dict_tree, (obj_dict,)
+            return object_hook_json_helper, (obj_dict,)
+        return NotImplemented
+
+
+def tl_obj_to_bytes(obj: TLObject) -> bytes:
+    _check_patch_was_applied()
+    buffer = io.BytesIO()
+    _TLPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buffer.getvalue()
+
+
+def tl_obj_from_bytes(dump: bytes) -> TLObject:
+    # pickle can run arbitrary code, never pass data from untrusted sources here
+    _check_patch_was_applied()
+    restored_obj = pickle.loads(dump)
     if not isinstance(restored_obj, TLObject):
         raise TypeError(f'restored object is not descendant of TLObject but {type(restored_obj)!r}')
     return restored_obj
 
 
+class _TestPeerChannel(telethon.tl.types.PeerChannel):
+    # not a direct TLObject subclass, so it is patched on first serialization and dumped as PeerChannel
+    pass
+
+
+TEST_SUBCLASS_OBJECT: Final = _TestPeerChannel(channel_id=1007)
+
+
+class _TestListObject(TLObject):
+    # hand-written to_dict() which fails on the None probe of patch_telethon_classes()
+    def __init__(self, items: list[TLObject]) -> None:
+        self.items = items
+
+    def to_dict(self) -> dict[str, Any]:
+        return {'_': '_TestListObject', 'items': [x.to_dict() for x in self.items]}
+
+
+TEST_LIST_OBJECT: Final = _TestListObject(items=[telethon.tl.types.PeerUser(user_id=1008)])
+
+# tuple vector, as Telethon client methods pass them
+TEST_TUPLE_REQUEST: Final = telethon.tl.functions.messages.GetMessagesRequest(
+    id=(telethon.tl.types.InputMessageID(id=1009), telethon.tl.types.InputMessageID(id=1010))
+)
+
+# orjson can't write these, tl_obj_to_string() falls back to the json module
+TEST_NON_FINITE_OBJECT: Final = telethon.tl.types.GeoPoint(long=math.inf, lat=-math.inf, access_hash=1011)
+TEST_WIDE_INT_OBJECT: Final = telethon.tl.types.ResPQ(
+    nonce=2**100, server_nonce=2**101, pq=b'\x10\x12', server_public_key_fingerprints=[1013]
+)
+
 TEST_MESSAGE: Final = patched.Message(
     id=1001,
     peer_id=telethon.tl.types.PeerChannel(channel_id=1002),
@@ -288,29 +706,90 @@ TEST_MESSAGE: Final = patched.Message(
 )
 
 
+def _dump_class_names(value: Any, names: set[str]) -> set[str]:
+    # collects "_" keys of a to_dict() result
+    if isinstance(value, dict):
+        if '_' in value:
+            names.add(value['_'])
+        for item in value.values():
+            _dump_class_names(item, names)
+    elif isinstance(value, list):
+        for item in value:
+            _dump_class_names(item, names)
+    return names
+
+
+def _check_restored_obj(obj: TLObject, restored_obj: TLObject, method: str) -> bool:
+    # subclasses of patched classes are restored as the patched class
+    if not isinstance(restored_obj, get_telethon_class(full_class_name(obj))):
+        logger.error(
+            'check_telethon_obj_serialization: %s: class mismatch: was %s, restored %s',
+            method,
+            full_class_name(obj),
+            full_class_name(restored_obj),
+        )
+        return False
+
+    if obj.to_dict() == restored_obj.to_dict():
+        return True
+
+    logger.error('check_telethon_obj_serialization: %s: dumps are differ', method)
+    logger.error('check_telethon_obj_serialization: source message dump:\n%s', obj.stringify())
+    logger.error('check_telethon_obj_serialization: restored message dump:\n%s', restored_obj.stringify())
+    return False
+
+
 def check_telethon_obj_serialization(obj: TLObject) -> bool:
     # noinspection PyBroadException
     try:
         logger.debug('instance to test:\n%s', obj.stringify())
         obj_dump = tl_obj_to_string(obj, ensure_ascii=False)
-        restored_obj = tl_obj_from_string(obj_dump)
-
-        if not isinstance(restored_obj, obj.__class__):
-            logger.error(
-                'check_telethon_obj_serialization: class mismatch: was %s, restored %s',
-                full_class_name(obj),
-                full_class_name(restored_obj),
-            )
+        if not _check_restored_obj(obj, tl_obj_from_string(obj_dump), 'string'):
             return False
 
-        if obj.to_dict() == restored_obj.to_dict():
-            logger.info('check_telethon_obj_serialization: OK')
-            return True
+        obj_dump = tl_obj_to_string(obj, ensure_ascii=False, indent=2)
+        if obj_dump != json.dumps(obj, cls=TLEncoder, ensure_ascii=False, indent=2):
+            logger.error('check_telethon_obj_serialization: indented dump differs from TLEncoder output')
+            return False
+        if not _check_restored_obj(obj, tl_obj_from_string(obj_dump), 'indented string'):
+            return False
 
-        logger.error('check_telethon_obj_serialization: dumps are differ')
-        logger.error('check_telethon_obj_serialization: source message dump:\n%s', obj.stringify())
-        logger.error('check_telethon_obj_serialization: restored message dump:\n%s', restored_obj.stringify())
-        return False
+        buffer = io.StringIO()
+        tl_obj_to_writer(obj, buffer)
+        if buffer.getvalue() != json.dumps(obj, cls=TLEncoder, ensure_ascii=False):
+            logger.error('check_telethon_obj_serialization: writer output differs from TLEncoder output')
+            return False
+        if not _check_restored_obj(obj, tl_obj_from_string(buffer.getvalue()), 'writer'):
+            return False
+
+        obj_dump = tl_obj_to_string(obj, ensure_ascii=False)
+        restored_objs = list(tl_obj_stream_from_strings([obj_dump, obj_dump], get_telethon_class(full_class_name(obj))))
+        if len(restored_objs) != 2:
+            logger.error('check_telethon_obj_serialization: stream: restored %d objects of 2', len(restored_objs))
+            return False
+        for restored_obj in restored_objs:
+            if not _check_restored_obj(obj, restored_obj, 'stream'):
+                return False
+
+        # every class lazy, the unmaterialized wrappers must dump the same as the source
+        lazy_class_names = set(_LAZY_CLASS_NAMES)
+        set_lazy_classes(_dump_class_names(obj.to_dict(), set()))
+        try:
+            restored_obj = tl_obj_from_string(obj_dump)
+            if tl_obj_to_string(restored_obj, ensure_ascii=False) != obj_dump:
+                logger.error('check_telethon_obj_serialization: lazy: dump of LazyTLWrapper differs')
+                return False
+            if not _check_restored_obj(obj, restored_obj, 'lazy string'):
+                return False
+        finally:
+            set_lazy_classes(lazy_class_names)
+
+        obj_bytes = tl_obj_to_bytes(obj)
+        if not _check_restored_obj(obj, tl_obj_from_bytes(obj_bytes), 'bytes'):
+            return False
+
+        logger.info('check_telethon_obj_serialization: OK')
+        return True
 
     except Exception:
         logger.exception('check_telethon_obj_serialization')
@@ -330,6 +809,11 @@ def main() -> None:
     report_same_basename_classes()
 
     check_telethon_obj_serialization(TEST_MESSAGE)
+    check_telethon_obj_serialization(TEST_SUBCLASS_OBJECT)
+    check_telethon_obj_serialization(TEST_LIST_OBJECT)
+    check_telethon_obj_serialization(TEST_TUPLE_REQUEST)
+    check_telethon_obj_serialization(TEST_NON_FINITE_OBJECT)
+    check_telethon_obj_serialization(TEST_WIDE_INT_OBJECT)
 
 
 if __name__ == '__main__':